@@ -1,7 +1,29 @@
 import aiohttp
 import hashlib
 import asyncio
-from typing import Dict, List
+import os
+import time
+from typing import Dict, List, Optional
+from .number_analysis import NumberAnalyzer
+
+class _RatePacer:
+    """توزيع الطلبات على حصة ثابتة مع إمكانية التأجيل عند Retry-After"""
+    
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.next_slot = 0.0
+        self._lock = asyncio.Lock()
+    
+    async def wait(self):
+        async with self._lock:
+            delay = self.next_slot - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self.next_slot = time.monotonic() + self.interval
+    
+    def defer(self, seconds: float):
+        """تأجيل جميع الطلبات التالية بعد رد 429"""
+        self.next_slot = max(self.next_slot, time.monotonic() + seconds)
 
 class BreachScanner:
     def __init__(self):
@@ -14,13 +36,166 @@ class BreachScanner:
         """فحص شامل للتسريبات"""
         tasks = [
             self.check_hibp(phone_number),
-            self.check_dehashed(phone_number),
-            self.check_breachdirectory(phone_number),
             self.check_local_databases(phone_number)
         ]
         
         results = await asyncio.gather(*tasks, return_exceptions=True)
         
+        return self._merge_results(results)
+    
+    async def check_many(self, phone_numbers: List[str]) -> Dict[str, Dict]:
+        """فحص التسريبات لعدة أرقام دفعة واحدة مع تجميع الطلبات حسب المصدر"""
+        # توحيد صيغ الرقم حتى لا يُفحص نفس الرقم أكثر من مرة
+        canonical = {phone_number: NumberAnalyzer.normalize_number(phone_number) for phone_number in phone_numbers}
+        unique_numbers = sorted(set(canonical.values()))
+        
+        sources = await asyncio.gather(
+            self._check_hibp_many(unique_numbers),
+            self._check_local_many(unique_numbers),
+            return_exceptions=True
+        )
+        
+        # المصدر الذي فشل بالكامل يُسجَّل كخطأ لكل رقم حتى لا يبدو كـ "لا تسريبات"
+        merged = {
+            number: self._merge_results([
+                source if isinstance(source, Exception) else source.get(number)
+                for source in sources
+            ])
+            for number in unique_numbers
+        }
+        
+        return {phone_number: merged[canonical[phone_number]] for phone_number in phone_numbers}
+    
+    async def check_hibp(self, phone_number: str) -> Dict:
+        """التحقق من Have I Been Pwned"""
+        try:
+            api_key = self.config.get('hibp_api_key')
+            if not api_key:
+                return {'found': False, 'message': 'No API key'}
+            
+            async with aiohttp.ClientSession() as session:
+                return await self._fetch_hibp(session, NumberAnalyzer.normalize_number(phone_number))
+        
+        except Exception as e:
+            return {'found': False, 'error': str(e)}
+    
+    async def check_local_databases(self, phone_number: str) -> Dict:
+        """التحقق من فهرس التسريبات المحلي"""
+        number = NumberAnalyzer.normalize_number(phone_number)
+        results = await self._check_local_many([number])
+        return results.get(number, {'found': False})
+    
+    async def _fetch_hibp(self, session: aiohttp.ClientSession, phone_number: str,
+                          pacer: Optional[_RatePacer] = None, retries: int = 3) -> Dict:
+        """طلب واحد إلى Have I Been Pwned مع احترام حد المعدل"""
+        headers = {'hibp-api-key': self.config.get('hibp_api_key')}
+        url = f"https://haveibeenpwned.com/api/v3/breachedaccount/{phone_number}"
+        # بدون truncateResponse=false يعيد HIBP اسم التسريب فقط دون DataClasses
+        params = {'truncateResponse': 'false'}
+        
+        for attempt in range(retries + 1):
+            if pacer is not None:
+                await pacer.wait()
+            
+            async with session.get(url, headers=headers, params=params) as response:
+                if response.status == 200:
+                    breaches = await response.json()
+                    return {
+                        'found': True,
+                        'count': len(breaches),
+                        'breaches': breaches,
+                        'data_types': self._extract_data_types(breaches),
+                        'source': 'Have I Been Pwned'
+                    }
+                if response.status == 404:
+                    return {'found': False}
+                if response.status != 429:
+                    return {'found': False, 'error': f'HIBP HTTP {response.status}'}
+                
+                # تجاوز الحصة: الانتظار حسب Retry-After ثم إعادة المحاولة
+                retry_after = float(response.headers.get('Retry-After', 2))
+            
+            if attempt == retries:
+                break
+            if pacer is not None:
+                pacer.defer(retry_after)
+            else:
+                await asyncio.sleep(retry_after)
+        
+        return {'found': False, 'error': 'Rate limited'}
+    
+    async def _check_hibp_many(self, phone_numbers: List[str]) -> Dict[str, Dict]:
+        """طلبات HIBP متتالية عبر اتصال واحد معاد استخدامه ضمن الحصة المسموحة"""
+        if not self.config.get('hibp_api_key'):
+            return {}
+        
+        # الحصة بعدد الطلبات في الدقيقة حسب خطة المفتاح
+        pacer = _RatePacer(60.0 / self.config.get('hibp_rate_limit', 10))
+        connector = aiohttp.TCPConnector(limit=self.config.get('hibp_connections', 1))
+        
+        async def fetch(session, phone_number):
+            try:
+                return await self._fetch_hibp(session, phone_number, pacer)
+            except Exception as e:
+                return {'found': False, 'error': str(e)}
+        
+        async with aiohttp.ClientSession(connector=connector) as session:
+            results = await asyncio.gather(*(fetch(session, number) for number in phone_numbers))
+        
+        return dict(zip(phone_numbers, results))
+    
+    async def _check_local_many(self, phone_numbers: List[str]) -> Dict[str, Dict]:
+        """فحص الفهرس المحلي مع قراءة كل حاوية مرة واحدة لجميع أرقامها"""
+        index_dir = self.config.get('local_breach_index')
+        if not index_dir:
+            return {}
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._probe_local_index, index_dir, phone_numbers)
+    
+    def _probe_local_index(self, index_dir: str, phone_numbers: List[str]) -> Dict[str, Dict]:
+        """قراءة حاويات الفهرس مرتبة حسب بادئة الـ hash
+        
+        كل حاوية ملف باسم أول 5 أحرف من SHA-1 للرقم (PREFIX.txt) وكل سطر فيها
+        بالشكل SUFFIX:COUNT[:DataClass1,DataClass2]
+        """
+        buckets = {}
+        for phone_number in phone_numbers:
+            phone_hash = hashlib.sha1(phone_number.encode()).hexdigest().upper()
+            buckets.setdefault(phone_hash[:5], {})[phone_hash[5:]] = phone_number
+        
+        results = {}
+        for prefix in sorted(buckets):
+            wanted = buckets[prefix]
+            path = os.path.join(index_dir, f"{prefix}.txt")
+            if not os.path.exists(path):
+                continue
+            
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    suffix, _, rest = line.strip().partition(':')
+                    phone_number = wanted.get(suffix.upper())
+                    if phone_number is None:
+                        continue
+                    
+                    count, _, data_types = rest.partition(':')
+                    results[phone_number] = {
+                        'found': True,
+                        'count': int(count or 0),
+                        'breaches': [],
+                        'data_types': [d for d in data_types.split(',') if d],
+                        'source': 'Local index'
+                    }
+        
+        return results
+    
+    def _merge_results(self, results: List) -> Dict:
+        """دمج نتائج المصادر المختلفة في نتيجة واحدة
+        
+        التسريبات المسماة تُدمج حسب الاسم. الفهرس المحلي يعطي عدداً بلا أسماء،
+        لذلك يكون العدد النهائي أكبر عدد بين المصادر وليس مجموعها، حتى لا
+        يُحتسب التسريب الموجود في أكثر من مصدر مرتين.
+        """
         breach_results = {
             'count': 0,
             'breaches': [],
@@ -28,47 +203,33 @@ class BreachScanner:
             'risk_score': 0
         }
         
+        errors = []
+        seen = set()
         for result in results:
+            if isinstance(result, Exception):
+                errors.append(str(result) or type(result).__name__)
+                continue
+            if isinstance(result, dict) and result.get('error'):
+                errors.append(result['error'])
             if isinstance(result, dict) and result.get('found', False):
-                breach_results['count'] += result.get('count', 0)
-                breach_results['breaches'].extend(result.get('breaches', []))
+                breach_results['count'] = max(breach_results['count'], result.get('count', 0))
+                for breach in result.get('breaches', []):
+                    name = breach.get('Name') if isinstance(breach, dict) else breach
+                    if name not in seen:
+                        seen.add(name)
+                        breach_results['breaches'].append(breach)
                 breach_results['data_types_found'].extend(result.get('data_types', []))
         
         # إزالة التكرارات
+        breach_results['count'] = max(breach_results['count'], len(breach_results['breaches']))
         breach_results['data_types_found'] = list(set(breach_results['data_types_found']))
         breach_results['risk_score'] = self._calculate_breach_risk(breach_results)
         
-        return breach_results
-    
-    async def check_hibp(self, phone_number: str) -> Dict:
-        """التحقق من Have I Been Pwned"""
-        try:
-            api_key = self.config.get('hibp_api_key')
-            if not api_key:
-                return {'found': False, 'error': 'No API key'}
-            
-            # تحويل الرقم إلى hash
-            phone_hash = hashlib.sha1(phone_number.encode()).hexdigest().upper()
-            
-            async with aiohttp.ClientSession() as session:
-                headers = {'hibp-api-key': api_key}
-                url = f"https://haveibeenpwned.com/api/v3/breachedaccount/{phone_number}"
-                
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        breaches = await response.json()
-                        return {
-                            'found': True,
-                            'count': len(breaches),
-                            'breaches': breaches,
-                            'data_types': self._extract_data_types(breaches),
-                            'source': 'Have I Been Pwned'
-                        }
-                    else:
-                        return {'found': False}
+        # النتيجة ناقصة إذا فشل أحد المصادر، فيجب ألا تُقارن بنتيجة كاملة
+        if errors:
+            breach_results['error'] = '; '.join(errors)
         
-        except Exception as e:
-            return {'found': False, 'error': str(e)}
+        return breach_results
     
     async def darkweb_scan(self, phone_number: str) -> Dict:
         """مسح Dark Web (محاكاة)"""
@@ -5,12 +5,16 @@ PhoneInfoga Pro - النسخة المتطورة
 """
 
 import argparse
+import asyncio
 import sys
 import json
 from datetime import datetime
 from src.core.scanner import AdvancedPhoneScanner
+from src.core.monitor import WatchlistMonitor
 from src.utils.logger import Logger
 from src.utils.export import ReportExporter
+from src.utils.profiler import ScanProfiler
+from src.utils.results_store import ResultsStore
 
 class PhoneInfogaPro:
     def __init__(self):
@@ -33,7 +37,7 @@ class PhoneInfogaPro:
         """تحليل وسيطات الأوامر"""
         parser = argparse.ArgumentParser(description='PhoneInfoga Pro - أداة متقدمة لجمع معلومات الهواتف')
         
-        parser.add_argument('phone', help='رقم الهاتف المستهدف (مثال: +1234567890)')
+        parser.add_argument('phone', nargs='?', help='رقم الهاتف المستهدف (مثال: +1234567890)')
         
         parser.add_argument('-o', '--output', help='حفظ النتائج في ملف',
                           choices=['json', 'html', 'pdf', 'txt'], default='txt')
@@ -62,7 +66,73 @@ class PhoneInfogaPro:
         parser.add_argument('--timeout', type=int, default=30,
                           help='المهلة للاتصالات (بالثواني)')
         
-        return parser.parse_args()
+        parser.add_argument('--monitor', metavar='WATCHLIST',
+                          help='وضع المراقبة: ملف قائمة الأرقام (رقم في كل سطر)')
+        
+        parser.add_argument('--monitor-tick', type=float, default=1.0,
+                          help='الفاصل الأدنى بين دورات المراقبة (بالثواني)')
+        
+        parser.add_argument('--monitor-max-per-tick', type=int, default=10,
+                          help='الحد الأقصى للمصادر المحدثة في كل دورة مراقبة')
+        
+        parser.add_argument('--profile', action='store_true',
+                          help='كشف توقف حلقة الأحداث وقياس زمن كل مرحلة')
+        
+        parser.add_argument('--profile-threshold', type=float, default=0.1,
+                          help='عتبة الـ callback البطيء (بالثواني)')
+        
+        parser.add_argument('--profile-capture', action='store_true',
+                          help='التقاط cProfile لكل مرحلة (يفعّل --profile)')
+        
+        parser.add_argument('--profile-output', default='profile_report.json',
+                          help='ملف تقرير الأداء')
+        
+        parser.add_argument('--store', default='results.db',
+                          help='مخزن النتائج التاريخية (SQLite)')
+        
+        parser.add_argument('--no-store', action='store_true',
+                          help='عدم حفظ نتيجة المسح في المخزن')
+        
+        parser.add_argument('--query', action='store_true',
+                          help='البحث في النتائج المخزنة بدلاً من المسح')
+        
+        parser.add_argument('--country-code', type=int, help='تصفية حسب رمز الدولة')
+        
+        parser.add_argument('--carrier', help='تصفية حسب المشغل')
+        
+        parser.add_argument('--risk-level', choices=['منخفض', 'متوسط', 'مرتفع'],
+                          help='تصفية حسب مستوى الخطورة')
+        
+        parser.add_argument('--min-breaches', type=int, help='الحد الأدنى لعدد التسريبات')
+        
+        parser.add_argument('--max-breaches', type=int, help='الحد الأقصى لعدد التسريبات')
+        
+        parser.add_argument('--data-class', action='append', dest='data_classes',
+                          help='نوع بيانات متسربة (يمكن تكراره، مثال: Passwords)')
+        
+        parser.add_argument('--since-days', type=float, help='النتائج خلال آخر N يوم')
+        
+        parser.add_argument('--limit', type=int, default=100, help='الحد الأقصى للنتائج')
+        
+        parser.add_argument('--compact', type=int, metavar='DAYS',
+                          help='ضغط النتائج الأقدم من N يوم في المخزن')
+        
+        args = parser.parse_args()
+        if args.profile_capture:
+            args.profile = True
+        
+        if not args.phone and not (args.monitor or args.query or args.compact is not None):
+            parser.error('يجب تحديد رقم الهاتف أو --monitor أو --query أو --compact')
+        
+        query_filters = [args.country_code, args.carrier, args.risk_level, args.min_breaches,
+                         args.max_breaches, args.data_classes, args.since_days]
+        if not args.query and any(f is not None for f in query_filters):
+            parser.error('مرشحات البحث (--country-code, --carrier, ...) تتطلب --query')
+        
+        if args.monitor and not self.select_monitor_scans(args):
+            parser.error('وضع المراقبة يتطلب مصدراً مدعوماً واحداً على الأقل (-s أو -b أو -g أو -a)')
+        
+        return args
     
     def load_config(self, api_keys_file):
         """تحميل التكوين ومفاتيح API"""
@@ -77,15 +147,29 @@ class PhoneInfogaPro:
         """تشغيل المسح الشامل"""
         self.logger.info(f"بدء المسح للرقم: {args.phone}")
         
-        # تحميل التكوين
+        # تحميل التكوين وإعداد الماسح الضوئي
+        self.setup_scanner(args)
+        
+        # تحديد الفحوصات المطلوبة
+        scans_to_run = self.select_scans(args)
+        
+        # تشغيل المسح
+        results = self.scanner.comprehensive_scan(args.phone, scans_to_run)
+        
+        return results
+    
+    def setup_scanner(self, args):
+        """تحميل التكوين وإعداد الماسح الضوئي"""
         config = self.load_config(args.api_keys)
         
-        # إعداد الماسح الضوئي
         self.scanner.set_config(config)
         self.scanner.set_timeout(args.timeout)
         self.scanner.set_threads(args.threads)
         
-        # تحديد الفحوصات المطلوبة
+        return config
+    
+    def select_scans(self, args):
+        """تحديد أنواع المسح حسب الوسيطات"""
         scans_to_run = []
         
         if args.all or args.social_media:
@@ -100,17 +184,91 @@ class PhoneInfogaPro:
         if args.deep_scan:
             scans_to_run.extend(['deep_web', 'forums', 'archives'])
         
-        # تشغيل المسح
-        results = self.scanner.comprehensive_scan(args.phone, scans_to_run)
+        return scans_to_run
+    
+    def select_monitor_scans(self, args):
+        """أنواع المسح المطلوبة التي يدعمها وضع المراقبة"""
+        return [s for s in self.select_scans(args) if s in WatchlistMonitor.SUPPORTED_SOURCES]
+    
+    def run_query(self, args):
+        """البحث في المخزن التاريخي وعرض النتائج"""
+        store = ResultsStore(args.store)
+        try:
+            if args.compact is not None:
+                compacted = store.compact(args.compact)
+                self.logger.success(f"تم ضغط {compacted} نتيجة")
+            
+            if args.query:
+                since = None
+                if args.since_days is not None:
+                    since = datetime.now().timestamp() - args.since_days * 86400
+                
+                rows = store.query(phone_number=args.phone, country_code=args.country_code,
+                                   carrier=args.carrier, risk_level=args.risk_level,
+                                   min_breaches=args.min_breaches, max_breaches=args.max_breaches,
+                                   data_classes=args.data_classes, since=since, limit=args.limit)
+                for row in rows:
+                    print(json.dumps(row, ensure_ascii=False))
+                self.logger.info(f"عدد النتائج: {len(rows)}")
+        finally:
+            store.close()
+    
+    def run_monitor(self, args):
+        """تشغيل وضع المراقبة المستمرة لقائمة الأرقام"""
+        config = self.setup_scanner(args)
         
-        return results
+        monitor = WatchlistMonitor(self.scanner, self.select_monitor_scans(args),
+                                   freshness=config.get('monitor_freshness'),
+                                   max_per_tick=args.monitor_max_per_tick)
+        numbers = monitor.load_watchlist(args.monitor)
+        monitor.add_numbers(numbers)
+        self.logger.info(f"بدء مراقبة {len(numbers)} رقم")
+        
+        def on_change(change):
+            print(json.dumps(change, ensure_ascii=False, default=str))
+        
+        async def monitor_loop():
+            profiler = self.scanner.profiler
+            if profiler is not None:
+                profiler.attach_loop(asyncio.get_running_loop())
+            try:
+                await monitor.run(on_change, tick=args.monitor_tick)
+            finally:
+                if profiler is not None:
+                    profiler.detach_loop()
+        
+        asyncio.run(monitor_loop())
     
     def main(self):
         """الدالة الرئيسية"""
         self.banner()
         args = self.parse_arguments()
         
+        store = None
+        profiler = None
+        
         try:
+            if args.query or args.compact is not None:
+                self.run_query(args)
+                return
+            
+            # القياس يخص مسارات المسح والمراقبة فقط
+            if args.profile:
+                profiler = ScanProfiler(args.profile_threshold, capture=args.profile_capture)
+                self.scanner.set_profiler(profiler)
+            
+            if args.monitor:
+                self.run_monitor(args)
+                return
+            
+            # فتح المخزن فقط عند تشغيل مسح يُحفظ فيه
+            if not args.no_store:
+                try:
+                    store = ResultsStore(args.store)
+                    self.scanner.set_store(store)
+                except Exception as e:
+                    self.logger.error(f"تعذر فتح مخزن النتائج {args.store}: {str(e)}")
+            
             # تشغيل المسح
             results = self.run_scan(args)
             
@@ -119,7 +277,8 @@ class PhoneInfogaPro:
             
             # تصدير النتائج إذا طُلب
             if args.output:
-                filename = self.exporter.export(results, args.output, args.phone)
+                with self.scanner.phase('export'):
+                    filename = self.exporter.export(results, args.output, args.phone)
                 self.logger.success(f"تم حفظ النتائج في: {filename}")
                 
         except KeyboardInterrupt:
@@ -128,6 +287,18 @@ class PhoneInfogaPro:
         except Exception as e:
             self.logger.error(f"حدث خطأ: {str(e)}")
             sys.exit(1)
+        finally:
+            if store is not None:
+                store.close()
+            
+            # حفظ تقرير الأداء حتى عند الإيقاف أو الخطأ
+            if profiler is not None:
+                try:
+                    report_file = profiler.write_report(args.profile_output)
+                    self.logger.success(f"تم حفظ تقرير الأداء في: {report_file}")
+                except Exception as e:
+                    # لا يجب أن يحجب فشل التقرير الخطأ الأصلي أو رمز الخروج
+                    self.logger.error(f"تعذر حفظ تقرير الأداء: {str(e)}")
     
     def display_results(self, results):
         """عرض النتائج بشكل منظم"""
@@ -2,7 +2,7 @@ import phonenumbers
 from phonenumbers import carrier, timezone, geocoder
 import re
 import json
-from typing import Dict
+from typing import Dict, List
 
 class NumberAnalyzer:
     def __init__(self):
@@ -44,6 +44,15 @@ class NumberAnalyzer:
         except Exception as e:
             return {'valid': False, 'error': str(e)}
     
+    @staticmethod
+    def normalize_number(phone_number: str) -> str:
+        """تحويل الرقم إلى صيغة E.164 الموحدة (مفتاح المقارنة والفهرسة)"""
+        try:
+            parsed_number = phonenumbers.parse(phone_number, None)
+            return phonenumbers.format_number(parsed_number, phonenumbers.PhoneNumberFormat.E164)
+        except Exception:
+            return '+' + re.sub(r'[^\d]', '', phone_number)
+    
     def _get_number_type(self, parsed_number) -> str:
         """تحديد نوع الرقم"""
         number_types = {
@@ -0,0 +1,271 @@
+import asyncio
+import heapq
+import time
+from typing import Dict, List, Optional, Callable
+from ..utils.logger import Logger
+
+class WatchlistMonitor:
+    """مراقبة قائمة أرقام بمسح تزايدي وإصدار الفروقات فقط"""
+
+    # نافذة الصلاحية الافتراضية لكل مصدر (بالثواني)
+    DEFAULT_FRESHNESS = {
+        'social_media': 6 * 3600,
+        'telegram': 6 * 3600,
+        'whatsapp': 6 * 3600,
+        'breaches': 24 * 3600,
+        'darkweb': 24 * 3600,
+        'geolocation': 7 * 24 * 3600
+    }
+
+    # المصادر التي يدعمها async_scan في الماسح
+    SUPPORTED_SOURCES = tuple(DEFAULT_FRESHNESS)
+
+    # إعادة محاولة المصادر الفاشلة بتأخير متزايد يبدأ من دقيقة
+    RETRY_BACKOFF = 60
+
+    # معامل النسبة الذهبية لتوزيع مواعيد التحديث بالتساوي داخل النافذة
+    _GOLDEN_RATIO = 0.6180339887498949
+
+    def __init__(self, scanner, scan_types: List[str], freshness: Optional[Dict] = None,
+                 max_per_tick: int = 10):
+        self.logger = Logger()
+        self.scanner = scanner
+        self.scan_types = [s for s in scan_types if s in self.SUPPORTED_SOURCES]
+        self.freshness = {**self.DEFAULT_FRESHNESS, **(freshness or {})}
+        self.max_per_tick = max_per_tick
+
+        # آخر نتيجة لكل (رقم، مصدر) وآخر ملخص لها
+        self.results = {}
+        self.summaries = {}
+        self.basic_info = {}
+        self.risk_levels = {}
+
+        # جدول المواعيد: (موعد الاستحقاق، الرقم، المصدر)
+        self._schedule = []
+        self._scheduled = set()
+        self._phase_counters = {}
+        self._failures = {}
+
+    def add_numbers(self, phone_numbers: List[str]):
+        """إضافة أرقام إلى قائمة المراقبة"""
+        now = time.time()
+        for phone_number in phone_numbers:
+            # توحيد الصيغة حتى لا يُراقب نفس الرقم مرتين بصيغتين مختلفتين
+            phone_number = self.scanner.number_analyzer.normalize_number(phone_number)
+            if phone_number in self.basic_info:
+                continue
+            # المعلومات الأساسية ثابتة فتُحسب مرة واحدة فقط
+            self.basic_info[phone_number] = self.scanner.number_analyzer.comprehensive_analysis(phone_number)
+            for source in self.scan_types:
+                # أول مسح فوري لبناء خط الأساس
+                self._push(now, phone_number, source)
+
+    def remove_number(self, phone_number: str):
+        """إزالة رقم من قائمة المراقبة"""
+        phone_number = self.scanner.number_analyzer.normalize_number(phone_number)
+        self.basic_info.pop(phone_number, None)
+        self.risk_levels.pop(phone_number, None)
+        for source in self.scan_types:
+            key = (phone_number, source)
+            self.results.pop(key, None)
+            self.summaries.pop(key, None)
+            self._failures.pop(key, None)
+            self._scheduled.discard(key)
+
+    def load_watchlist(self, path: str) -> List[str]:
+        """قراءة قائمة المراقبة من ملف (رقم في كل سطر)"""
+        numbers = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.split('#', 1)[0].strip()
+                if line:
+                    numbers.append(line)
+        return numbers
+
+    def next_due(self) -> Optional[float]:
+        """موعد أقرب تحديث مستحق"""
+        while self._schedule and (self._schedule[0][1], self._schedule[0][2]) not in self._scheduled:
+            heapq.heappop(self._schedule)
+        return self._schedule[0][0] if self._schedule else None
+
+    async def run_pass(self, now: Optional[float] = None) -> List[Dict]:
+        """تحديث المصادر المنتهية صلاحيتها فقط وإرجاع الفروقات"""
+        now = time.time() if now is None else now
+
+        due = []
+        while self._schedule and len(due) < self.max_per_tick and self._schedule[0][0] <= now:
+            scheduled_at, phone_number, source = heapq.heappop(self._schedule)
+            key = (phone_number, source)
+            if key in self._scheduled:
+                self._scheduled.discard(key)
+                due.append((scheduled_at, phone_number, source))
+
+        if not due:
+            return []
+
+        semaphore = asyncio.Semaphore(self.scanner.max_threads)
+
+        # التسريبات المستحقة تُفحص دفعة واحدة لتقليل كلفة كل رقم،
+        # بالتوازي مع بقية المصادر حتى لا تؤخرها حصة HIBP
+        breach_numbers = [p for _, p, s in due if s == 'breaches']
+
+        async def check_breaches():
+            try:
+                return await self.scanner.breach_scanner.check_many(breach_numbers)
+            except Exception as e:
+                self.logger.error(f"خطأ في فحص التسريبات الجماعي: {str(e)}")
+                return {}
+
+        batch = asyncio.ensure_future(check_breaches()) if breach_numbers else None
+
+        async def refresh(phone_number, source):
+            if source == 'breaches':
+                return (await batch).get(phone_number, {})
+            async with semaphore:
+                with self.scanner.phase(f'scan:{source}'):
+                    return await self.scanner.async_scan(phone_number, source)
+
+        with self.scanner.phase('monitor_pass'):
+            fetched = await asyncio.gather(*(refresh(p, s) for _, p, s in due), return_exceptions=True)
+
+        changes = []
+        touched = set()
+        for (scheduled_at, phone_number, source), result in zip(due, fetched):
+            if phone_number not in self.basic_info:
+                # أزيل الرقم أثناء التحديث
+                continue
+
+            key = (phone_number, source)
+            if isinstance(result, Exception) or not result or result.get('error'):
+                # نتيجة فاشلة أو ناقصة: الإبقاء على السابقة وإعادة المحاولة قريباً
+                self._retry(now, phone_number, source)
+                continue
+
+            self._failures.pop(key, None)
+            first_scan = key not in self.results
+            self._reschedule(now, scheduled_at, phone_number, source, first_scan)
+
+            summary = self._summarize(source, result)
+            previous = self.summaries.get((phone_number, source))
+            self.results[(phone_number, source)] = result
+            self.summaries[(phone_number, source)] = summary
+
+            if previous is not None and previous != summary:
+                changes.extend(self._diff(phone_number, source, previous, summary, now))
+            touched.add(phone_number)
+
+        # إعادة حساب المخاطر للأرقام التي تغيرت مصادرها فقط، وبعد اكتمال خط الأساس
+        # لجميع مصادر الرقم حتى لا يظهر وصول أول نتيجة لمصدر كأنه تغيير
+        for phone_number in touched:
+            if not all((phone_number, source) in self.results for source in self.scan_types):
+                continue
+            with self.scanner.phase('risk_scoring'):
+                level = self._risk_level(phone_number)
+            previous_level = self.risk_levels.get(phone_number)
+            self.risk_levels[phone_number] = level
+            if previous_level is not None and previous_level != level:
+                changes.append(self._change(phone_number, 'risk_assessment', 'level',
+                                            previous_level, level, now))
+
+        return changes
+
+    async def run(self, on_change: Callable[[Dict], None], tick: float = 1.0,
+                  max_passes: Optional[int] = None):
+        """حلقة المراقبة المستمرة"""
+        passes = 0
+        while max_passes is None or passes < max_passes:
+            for change in await self.run_pass():
+                on_change(change)
+            passes += 1
+
+            next_due = self.next_due()
+            if next_due is None:
+                break
+            await asyncio.sleep(max(next_due - time.time(), tick))
+
+    def _push(self, due: float, phone_number: str, source: str):
+        heapq.heappush(self._schedule, (due, phone_number, source))
+        self._scheduled.add((phone_number, source))
+
+    def _retry(self, now: float, phone_number: str, source: str):
+        """جدولة إعادة محاولة مصدر فاشل بتأخير متزايد لا يتجاوز نافذة الصلاحية"""
+        key = (phone_number, source)
+        failures = self._failures.get(key, 0) + 1
+        self._failures[key] = failures
+
+        window = self.freshness.get(source, 24 * 3600)
+        delay = min(self.RETRY_BACKOFF * 2 ** (failures - 1), window)
+        self.logger.warning(f"تعذر تحديث {source} للرقم {phone_number}، إعادة المحاولة بعد {int(delay)} ثانية")
+        self._push(now + delay, phone_number, source)
+
+    def _reschedule(self, now: float, scheduled_at: float, phone_number: str, source: str,
+                    first_scan: bool):
+        """جدولة التحديث التالي مع توزيع المواعيد بالتساوي"""
+        window = self.freshness.get(source, 24 * 3600)
+        if first_scan:
+            # إزاحة كل رقم داخل النافذة لتجنب تحديث الجميع في نفس اللحظة
+            counter = self._phase_counters.get(source, 0)
+            self._phase_counters[source] = counter + 1
+            phase = (counter * self._GOLDEN_RATIO) % 1.0
+            due = now + window * (0.5 + phase / 2)
+        else:
+            # الاحتفاظ بالإزاحة الأصلية حتى لا تتجمع المواعيد مع الوقت
+            due = scheduled_at + window
+            if due <= now:
+                due = now + window
+        self._push(due, phone_number, source)
+
+    def _summarize(self, source: str, result: Dict) -> Dict:
+        """استخراج الحقول التي تهمنا للمقارنة"""
+        if source == 'breaches':
+            names = [b.get('Name', str(b)) if isinstance(b, dict) else str(b)
+                     for b in result.get('breaches', [])]
+            return {
+                'count': result.get('count', 0),
+                'breaches': sorted(set(names)),
+                'data_types_found': sorted(result.get('data_types_found', []))
+            }
+        if source == 'social_media':
+            platforms = result.get('platforms', {})
+            return {
+                'profiles_found': result.get('profiles_found', 0),
+                'platforms': sorted(p for p, r in platforms.items() if r and r.get('found', False))
+            }
+        return {'found': result.get('found', False)}
+
+    def _diff(self, phone_number: str, source: str, previous: Dict, current: Dict,
+              now: float) -> List[Dict]:
+        """حساب الفروقات بين ملخصين"""
+        changes = []
+        for field in current:
+            old, new = previous.get(field), current[field]
+            if old == new:
+                continue
+            if isinstance(new, list):
+                added = [item for item in new if item not in (old or [])]
+                removed = [item for item in (old or []) if item not in new]
+                if added:
+                    changes.append(self._change(phone_number, source, f'new_{field}', None, added, now))
+                if removed:
+                    changes.append(self._change(phone_number, source, f'removed_{field}', removed, None, now))
+            else:
+                changes.append(self._change(phone_number, source, field, old, new, now))
+        return changes
+
+    def _change(self, phone_number: str, source: str, field: str, old, new, now: float) -> Dict:
+        return {
+            'phone_number': phone_number,
+            'source': source,
+            'field': field,
+            'old': old,
+            'new': new,
+            'timestamp': now
+        }
+
+    def _risk_level(self, phone_number: str) -> str:
+        """حساب مستوى الخطورة من النتائج المخزنة"""
+        results = {'basic_info': self.basic_info[phone_number]}
+        for source in self.scan_types:
+            if (phone_number, source) in self.results:
+                results[source] = self.results[(phone_number, source)]
+        return self.scanner._calculate_risk_assessment(results)['level']
@@ -1,6 +1,7 @@
 import asyncio
 import aiohttp
 import concurrent.futures
+import contextlib
 from typing import Dict, List, Any
 import json
 import re
@@ -20,6 +21,8 @@ class AdvancedPhoneScanner:
         self.config = {}
         self.timeout = 30
         self.max_threads = 5
+        self.profiler = None
+        self.store = None
         
     def set_config(self, config: Dict):
         """تعيين تكوين الماسح الضوئي"""
@@ -35,6 +38,20 @@ class AdvancedPhoneScanner:
         """تعيين عدد الثreads"""
         self.max_threads = threads
     
+    def set_profiler(self, profiler):
+        """تفعيل أداة قياس الأداء (وضع --profile)"""
+        self.profiler = profiler
+    
+    def set_store(self, store):
+        """تعيين مخزن النتائج لحفظ كل مسح شامل"""
+        self.store = store
+    
+    def phase(self, name: str):
+        """قياس مرحلة إذا كان القياس مفعلاً"""
+        if self.profiler is None:
+            return contextlib.nullcontext()
+        return self.profiler.phase(name)
+    
     async def async_scan(self, phone_number: str, scan_type: str) -> Dict:
         """مسح غير متزامن"""
         try:
@@ -68,17 +85,31 @@ class AdvancedPhoneScanner:
                 'scan_types': scan_types,
                 'version': 'PhoneInfoga Pro 2.0'
             },
-            'basic_info': self.number_analyzer.comprehensive_analysis(phone_number)
         }
         
+        with self.phase('basic_analysis'):
+            results['basic_info'] = self.number_analyzer.comprehensive_analysis(phone_number)
+        
         # المسح غير المتزامن
+        async def timed_scan(scan_type):
+            with self.phase(f'scan:{scan_type}'):
+                return await self.async_scan(phone_number, scan_type)
+        
         async def run_all_scans():
+            if self.profiler is not None:
+                self.profiler.attach_loop(asyncio.get_running_loop())
+            
             tasks = []
             for scan_type in scan_types:
-                task = self.async_scan(phone_number, scan_type)
+                task = timed_scan(scan_type)
                 tasks.append(task)
             
-            scan_results = await asyncio.gather(*tasks, return_exceptions=True)
+            try:
+                with self.phase('scans'):
+                    scan_results = await asyncio.gather(*tasks, return_exceptions=True)
+            finally:
+                if self.profiler is not None:
+                    self.profiler.detach_loop()
             
             for i, scan_type in enumerate(scan_types):
                 if not isinstance(scan_results[i], Exception):
@@ -95,8 +126,17 @@ class AdvancedPhoneScanner:
             loop.close()
         
         # إضافة التقييم النهائي
-        results['risk_assessment'] = self._calculate_risk_assessment(results)
-        results['recommendations'] = self._generate_recommendations(results)
+        with self.phase('risk_scoring'):
+            results['risk_assessment'] = self._calculate_risk_assessment(results)
+            results['recommendations'] = self._generate_recommendations(results)
+        
+        # حفظ النتيجة في المخزن التاريخي
+        if self.store is not None:
+            try:
+                self.store.save(results)
+            except Exception as e:
+                # فشل الحفظ لا يجب أن يضيع نتيجة مسح مكتمل
+                self.logger.error(f"تعذر حفظ النتيجة في المخزن: {str(e)}")
         
         return results
     
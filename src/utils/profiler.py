@@ -0,0 +1,208 @@
+import asyncio
+import cProfile
+import json
+import logging
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from typing import Dict, List
+
+class _AsyncioSlowCallbackHandler(logging.Handler):
+    """التقاط تحذيرات asyncio عن الـ callbacks البطيئة"""
+
+    def __init__(self, profiler):
+        super().__init__(level=logging.WARNING)
+        self.profiler = profiler
+
+    def emit(self, record):
+        match = self.profiler._SLOW_CALLBACK.match(record.getMessage())
+        if match:
+            self.profiler.slow_callbacks.append({
+                'callback': self.profiler._normalize_callback(match.group('callback')),
+                'duration': float(match.group('duration'))
+            })
+
+class ScanProfiler:
+    """كشف توقف حلقة الأحداث وقياس أداء مراحل المسح"""
+
+    # رسالة asyncio في وضع التصحيح: Executing <Handle ...> took 0.301 seconds
+    _SLOW_CALLBACK = re.compile(r'^Executing (?P<callback>.*) took (?P<duration>[\d.]+) seconds$', re.S)
+
+    def __init__(self, slow_threshold: float = 0.1, capture: bool = False, top: int = 25):
+        self.slow_threshold = slow_threshold
+        self.capture = capture
+        self.top = top
+
+        self.phases = {}
+        self.stalls = []
+        self.slow_callbacks = []
+
+        self._active_profile = None
+        self._loop = None
+        self._loop_thread_id = None
+        self._heartbeat_task = None
+        self._watchdog = None
+        self._stop = threading.Event()
+        self._last_beat = 0.0
+        self._log_handler = None
+        self._saved_loop_settings = None
+
+    @contextmanager
+    def phase(self, name: str):
+        """قياس مرحلة واحدة (مع cProfile إذا كان الالتقاط مفعلاً)"""
+        stats = self.phases.setdefault(name, {'calls': 0, 'wall_time': 0.0, 'profile': None})
+
+        # cProfile لا يدعم أكثر من ملف تعريف نشط، فالمراحل المتداخلة تُقاس زمنياً فقط
+        profile = None
+        if self.capture and self._active_profile is None:
+            profile = cProfile.Profile()
+            self._active_profile = profile
+            profile.enable()
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if profile is not None:
+                profile.disable()
+                self._active_profile = None
+                if stats['profile'] is None:
+                    stats['profile'] = pstats.Stats(profile)
+                else:
+                    stats['profile'].add(profile)
+            stats['calls'] += 1
+            stats['wall_time'] += elapsed
+
+    def attach_loop(self, loop: asyncio.AbstractEventLoop):
+        """تفعيل كشف الـ callbacks البطيئة على حلقة الأحداث الحالية"""
+        self._loop = loop
+        self._loop_thread_id = threading.get_ident()
+
+        self._saved_loop_settings = (loop.get_debug(), loop.slow_callback_duration)
+        loop.set_debug(True)
+        loop.slow_callback_duration = self.slow_threshold
+
+        self._log_handler = _AsyncioSlowCallbackHandler(self)
+        logging.getLogger('asyncio').addHandler(self._log_handler)
+
+        # نبضة دورية على الحلقة يراقبها خيط منفصل لالتقاط المكدس أثناء التوقف
+        self._last_beat = time.perf_counter()
+        self._heartbeat_task = loop.create_task(self._heartbeat())
+        self._stop.clear()
+        self._watchdog = threading.Thread(target=self._watch, name='loop-stall-watchdog', daemon=True)
+        self._watchdog.start()
+
+    def detach_loop(self):
+        """إيقاف المراقبة وفصلها عن حلقة الأحداث"""
+        self._stop.set()
+        if self._watchdog is not None:
+            self._watchdog.join()
+            self._watchdog = None
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            self._heartbeat_task = None
+        if self._log_handler is not None:
+            logging.getLogger('asyncio').removeHandler(self._log_handler)
+            self._log_handler = None
+        if self._loop is not None and self._saved_loop_settings is not None:
+            debug, slow_callback_duration = self._saved_loop_settings
+            self._loop.set_debug(debug)
+            self._loop.slow_callback_duration = slow_callback_duration
+            self._saved_loop_settings = None
+        self._loop = None
+
+    async def _heartbeat(self):
+        interval = self.slow_threshold / 4
+        while True:
+            self._last_beat = time.perf_counter()
+            await asyncio.sleep(interval)
+
+    def _watch(self):
+        """خيط المراقبة: التقاط مكدس حلقة الأحداث عند تجاوز العتبة"""
+        interval = self.slow_threshold / 4
+        current = None
+        while not self._stop.wait(interval):
+            last_beat = self._last_beat
+            lag = time.perf_counter() - last_beat
+            if lag <= self.slow_threshold:
+                current = None
+                continue
+
+            if current is not None and current['beat'] == last_beat:
+                # نفس التوقف ما زال مستمراً
+                current['duration'] = lag
+                continue
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = self._format_stack(frame) if frame is not None else []
+            current = {'beat': last_beat, 'duration': lag, 'stack': stack}
+            self.stalls.append(current)
+
+    def _format_stack(self, frame) -> List[str]:
+        return [
+            f"{self._short_path(entry.filename)}:{entry.lineno} in {entry.name}"
+            for entry in traceback.extract_stack(frame)
+        ]
+
+    def _short_path(self, path: str) -> str:
+        """مسارات نسبية ثابتة حتى يمكن مقارنة التقارير بين الإصدارات"""
+        for prefix in sorted(sys.path, key=len, reverse=True):
+            if prefix and path.startswith(prefix + os.sep):
+                return path[len(prefix) + 1:]
+        return path
+
+    def _normalize_callback(self, callback: str) -> str:
+        """إزالة ما يتغير بين التشغيلات (أرقام المهام، مواقع الإنشاء، المسارات المطلقة)"""
+        callback = re.sub(r" name='Task-\d+'", '', callback)
+        callback = re.sub(r' created at [^>]+(?=>$)', '', callback)
+        callback = re.sub(r' (?:result|exception)=.*(?=>$)', '', callback, flags=re.S)
+        return re.sub(
+            r'(?<=at )([^\s>]+):(\d+)',
+            lambda m: f"{self._short_path(m.group(1))}:{m.group(2)}",
+            callback
+        )
+
+    def _top_functions(self, stats: pstats.Stats) -> List[Dict]:
+        entries = []
+        for (filename, lineno, name), (cc, nc, tt, ct, _) in stats.stats.items():
+            entries.append({
+                'function': f"{self._short_path(filename)}:{lineno}({name})",
+                'ncalls': nc,
+                'tottime': round(tt, 6),
+                'cumtime': round(ct, 6)
+            })
+        entries.sort(key=lambda e: e['cumtime'], reverse=True)
+        return entries[:self.top]
+
+    def report(self) -> Dict:
+        """بناء تقرير الأداء"""
+        phases = {}
+        for name, stats in self.phases.items():
+            phases[name] = {
+                'calls': stats['calls'],
+                'wall_time': round(stats['wall_time'], 6)
+            }
+            if stats['profile'] is not None:
+                phases[name]['top_functions'] = self._top_functions(stats['profile'])
+
+        return {
+            'slow_threshold': self.slow_threshold,
+            'phases': phases,
+            'stalls': [
+                {'duration': round(stall['duration'], 6), 'stack': stall['stack']}
+                for stall in self.stalls
+            ],
+            'slow_callbacks': self.slow_callbacks
+        }
+
+    def write_report(self, path: str) -> str:
+        """حفظ التقرير بصيغة JSON مرتبة قابلة للمقارنة"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2, sort_keys=True)
+        return path
@@ -0,0 +1,184 @@
+import json
+import sqlite3
+import time
+import zlib
+from datetime import datetime
+from typing import Dict, List, Optional, Union
+from ..modules.number_analysis import NumberAnalyzer
+
+class ResultsStore:
+    """مخزن محلي لنتائج المسح مع فهارس للحقول المستخدمة في التصفية"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS scans (
+            id INTEGER PRIMARY KEY,
+            phone_number TEXT NOT NULL,
+            country_code INTEGER,
+            carrier TEXT,
+            risk_level TEXT,
+            risk_score INTEGER,
+            breach_count INTEGER NOT NULL DEFAULT 0,
+            scanned_at REAL NOT NULL,
+            result BLOB
+        );
+        CREATE TABLE IF NOT EXISTS scan_data_classes (
+            data_class TEXT NOT NULL,
+            scan_id INTEGER NOT NULL REFERENCES scans(id) ON DELETE CASCADE,
+            PRIMARY KEY (data_class, scan_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_data_classes_scan ON scan_data_classes(scan_id);
+        CREATE INDEX IF NOT EXISTS idx_scans_scanned_at ON scans(scanned_at);
+        CREATE INDEX IF NOT EXISTS idx_scans_phone ON scans(phone_number, scanned_at);
+        CREATE INDEX IF NOT EXISTS idx_scans_country ON scans(country_code, scanned_at);
+        CREATE INDEX IF NOT EXISTS idx_scans_carrier ON scans(carrier, scanned_at);
+        CREATE INDEX IF NOT EXISTS idx_scans_risk ON scans(risk_level, scanned_at);
+        CREATE INDEX IF NOT EXISTS idx_scans_breaches ON scans(breach_count, scanned_at);
+    """
+
+    SUMMARY_COLUMNS = ['id', 'phone_number', 'country_code', 'carrier', 'risk_level',
+                       'risk_score', 'breach_count', 'scanned_at']
+
+    def __init__(self, path: str = 'results.db'):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA foreign_keys=ON')
+        self.conn.executescript(self.SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def save(self, results: Dict, scanned_at: Optional[float] = None) -> int:
+        """حفظ نتيجة comprehensive_scan وإرجاع معرفها"""
+        basic_info = results.get('basic_info', {})
+        breaches = results.get('breaches', {})
+        risk = results.get('risk_assessment', {})
+        data_classes = {str(d).lower() for d in breaches.get('data_types_found', [])}
+
+        blob = zlib.compress(json.dumps(results, ensure_ascii=False, default=str).encode('utf-8'))
+
+        with self.conn:
+            cursor = self.conn.execute(
+                """INSERT INTO scans (phone_number, country_code, carrier, risk_level,
+                                      risk_score, breach_count, scanned_at, result)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                (
+                    NumberAnalyzer.normalize_number(results.get('scan_info', {}).get('phone_number', '')),
+                    basic_info.get('country_code'),
+                    basic_info.get('carrier') or None,
+                    risk.get('level'),
+                    risk.get('score'),
+                    breaches.get('count', 0),
+                    time.time() if scanned_at is None else scanned_at,
+                    blob
+                )
+            )
+            scan_id = cursor.lastrowid
+            self.conn.executemany(
+                "INSERT INTO scan_data_classes (data_class, scan_id) VALUES (?, ?)",
+                [(data_class, scan_id) for data_class in sorted(data_classes)]
+            )
+        return scan_id
+
+    def query(self, phone_number: Optional[str] = None, country_code: Optional[int] = None,
+              carrier: Optional[str] = None, risk_level: Optional[str] = None,
+              min_breaches: Optional[int] = None, max_breaches: Optional[int] = None,
+              data_classes: Optional[List[str]] = None,
+              since: Optional[Union[float, datetime]] = None,
+              until: Optional[Union[float, datetime]] = None,
+              limit: Optional[int] = 100) -> List[Dict]:
+        """البحث في النتائج المخزنة حسب المرشحات (الأحدث أولاً)"""
+        where, params = self._build_filters(phone_number, country_code, carrier, risk_level,
+                                            min_breaches, max_breaches, data_classes, since, until)
+        sql = f"SELECT {', '.join(self.SUMMARY_COLUMNS)} FROM scans{where} ORDER BY scanned_at DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        rows = [dict(zip(self.SUMMARY_COLUMNS, row)) for row in self.conn.execute(sql, params)]
+        if rows:
+            classes = self._data_classes_for([row['id'] for row in rows])
+            for row in rows:
+                row['data_classes'] = classes.get(row['id'], [])
+        return rows
+
+    def count(self, **filters) -> int:
+        """عدد النتائج المطابقة للمرشحات"""
+        where, params = self._build_filters(**filters)
+        return self.conn.execute(f"SELECT COUNT(*) FROM scans{where}", params).fetchone()[0]
+
+    def get_result(self, scan_id: int) -> Optional[Dict]:
+        """استرجاع النتيجة الكاملة (None إذا ضُغطت)"""
+        row = self.conn.execute("SELECT result FROM scans WHERE id = ?", (scan_id,)).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return json.loads(zlib.decompress(row[0]).decode('utf-8'))
+
+    def compact(self, older_than_days: int = 90) -> int:
+        """حذف النتائج الكاملة القديمة مع الإبقاء على الحقول المفهرسة وآخر نتيجة لكل رقم"""
+        cutoff = time.time() - older_than_days * 86400
+        with self.conn:
+            cursor = self.conn.execute(
+                """UPDATE scans SET result = NULL
+                   WHERE scanned_at < ? AND result IS NOT NULL
+                     AND id NOT IN (SELECT MAX(id) FROM scans GROUP BY phone_number)""",
+                (cutoff,)
+            )
+            compacted = cursor.rowcount
+        self.conn.execute('VACUUM')
+        return compacted
+
+    def _build_filters(self, phone_number=None, country_code=None, carrier=None, risk_level=None,
+                       min_breaches=None, max_breaches=None, data_classes=None,
+                       since=None, until=None):
+        clauses = []
+        params = []
+
+        if phone_number is not None:
+            phone_number = NumberAnalyzer.normalize_number(phone_number)
+
+        for column, value in (('phone_number', phone_number), ('country_code', country_code),
+                              ('carrier', carrier), ('risk_level', risk_level)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+
+        if min_breaches is not None:
+            clauses.append("breach_count >= ?")
+            params.append(min_breaches)
+        if max_breaches is not None:
+            clauses.append("breach_count <= ?")
+            params.append(max_breaches)
+        if since is not None:
+            clauses.append("scanned_at >= ?")
+            params.append(self._to_timestamp(since))
+        if until is not None:
+            clauses.append("scanned_at < ?")
+            params.append(self._to_timestamp(until))
+
+        # يجب أن تحتوي النتيجة على جميع أنواع البيانات المطلوبة
+        for data_class in data_classes or []:
+            clauses.append(
+                "id IN (SELECT scan_id FROM scan_data_classes WHERE data_class = ?)"
+            )
+            params.append(data_class.lower())
+
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def _data_classes_for(self, scan_ids: List[int]) -> Dict[int, List[str]]:
+        classes = {}
+        placeholders = ', '.join('?' * len(scan_ids))
+        rows = self.conn.execute(
+            f"SELECT scan_id, data_class FROM scan_data_classes WHERE scan_id IN ({placeholders})",
+            scan_ids
+        )
+        for scan_id, data_class in rows:
+            classes.setdefault(scan_id, []).append(data_class)
+        return classes
+
+
+    def _to_timestamp(self, value: Union[float, datetime]) -> float:
+        if isinstance(value, datetime):
+            return value.timestamp()
+        return float(value)
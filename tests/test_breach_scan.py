@@ -0,0 +1,146 @@
+import asyncio
+import hashlib
+
+import pytest
+
+breach_scan = pytest.importorskip('src.modules.breach_scan')
+BreachScanner = breach_scan.BreachScanner
+
+
+class FakeResponse:
+    def __init__(self, status, payload=None, headers=None):
+        self.status = status
+        self.payload = payload
+        self.headers = headers or {}
+
+    async def json(self):
+        return self.payload
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    """يعيد ردوداً محددة مسبقاً ويسجل الطلبات"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, headers=None, params=None):
+        self.requests.append((url, params))
+        return self.responses.pop(0)
+
+
+def write_bucket(index_dir, phone_number, line_rest):
+    phone_hash = hashlib.sha1(phone_number.encode()).hexdigest().upper()
+    with open(index_dir / f"{phone_hash[:5]}.txt", 'a', encoding='utf-8') as f:
+        f.write(f"{phone_hash[5:].lower()}:{line_rest}\n")
+
+
+def test_probe_local_index(tmp_path):
+    write_bucket(tmp_path, '+15551234', '2:Passwords,Emails')
+    write_bucket(tmp_path, '+15559999', '1')
+
+    results = BreachScanner()._probe_local_index(str(tmp_path), ['+15551234', '+15559999', '+15550000'])
+
+    assert results['+15551234']['count'] == 2
+    assert results['+15551234']['data_types'] == ['Passwords', 'Emails']
+    assert results['+15559999']['data_types'] == []
+    assert '+15550000' not in results
+
+
+def test_merge_results_dedupes_breaches():
+    merged = BreachScanner()._merge_results([
+        {'found': True, 'count': 2, 'breaches': [{'Name': 'A'}, {'Name': 'B'}], 'data_types': ['Passwords']},
+        {'found': True, 'count': 1, 'breaches': [{'Name': 'A'}], 'data_types': ['Passwords']},
+        {'found': True, 'count': 3, 'breaches': [], 'data_types': []}
+    ])
+
+    assert [b['Name'] for b in merged['breaches']] == ['A', 'B']
+    assert merged['count'] == 3
+    assert merged['data_types_found'] == ['Passwords']
+    assert 'error' not in merged
+
+
+def test_merge_results_carries_errors():
+    merged = BreachScanner()._merge_results([
+        {'found': False, 'error': 'Rate limited'},
+        RuntimeError('index unavailable')
+    ])
+
+    assert merged['count'] == 0
+    assert 'Rate limited' in merged['error']
+    assert 'index unavailable' in merged['error']
+
+
+def test_check_many_dedupes_formats_and_reports_failed_source(tmp_path):
+    write_bucket(tmp_path, '+15551234', '1:Passwords')
+    scanner = BreachScanner()
+    scanner.set_config({'local_breach_index': str(tmp_path)})
+
+    results = asyncio.run(scanner.check_many(['+1 555 1234', '+15551234']))
+    assert results['+1 555 1234'] == results['+15551234']
+    assert results['+15551234']['count'] == 1
+
+    async def broken(numbers):
+        raise OSError('disk error')
+
+    scanner._check_local_many = broken
+    results = asyncio.run(scanner.check_many(['+15551234']))
+    assert 'disk error' in results['+15551234']['error']
+
+
+@pytest.mark.parametrize('status, expected', [
+    (404, {'found': False}),
+    (500, {'found': False, 'error': 'HIBP HTTP 500'}),
+])
+def test_fetch_hibp_status_handling(status, expected):
+    session = FakeSession([FakeResponse(status)])
+
+    assert asyncio.run(BreachScanner()._fetch_hibp(session, '+15551234')) == expected
+
+
+def test_fetch_hibp_requests_full_breach_details():
+    breaches = [{'Name': 'A', 'DataClasses': ['Passwords']}]
+    session = FakeSession([FakeResponse(200, breaches)])
+
+    result = asyncio.run(BreachScanner()._fetch_hibp(session, '+15551234'))
+
+    assert session.requests[0][1] == {'truncateResponse': 'false'}
+    assert result['data_types'] == ['Passwords']
+
+
+def test_fetch_hibp_retry_goes_through_pacer():
+    session = FakeSession([FakeResponse(429, headers={'Retry-After': '0'}), FakeResponse(200, [])])
+
+    class RecordingPacer:
+        def __init__(self):
+            self.waits = 0
+            self.deferred = []
+
+        async def wait(self):
+            self.waits += 1
+
+        def defer(self, seconds):
+            self.deferred.append(seconds)
+
+    pacer = RecordingPacer()
+    result = asyncio.run(BreachScanner()._fetch_hibp(session, '+15551234', pacer))
+
+    assert result['found'] is True
+    assert pacer.waits == 2
+    assert pacer.deferred == [0.0]
+
+
+def test_fetch_hibp_gives_up_without_sleeping_after_last_attempt():
+    session = FakeSession([FakeResponse(429, headers={'Retry-After': '60'})])
+
+    result = asyncio.run(asyncio.wait_for(
+        BreachScanner()._fetch_hibp(session, '+15551234', retries=0), timeout=1
+    ))
+
+    assert result == {'found': False, 'error': 'Rate limited'}
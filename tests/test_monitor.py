@@ -0,0 +1,147 @@
+import asyncio
+import contextlib
+
+import pytest
+
+monitor = pytest.importorskip('src.core.monitor')
+WatchlistMonitor = monitor.WatchlistMonitor
+
+
+class FakeBreachScanner:
+    def __init__(self):
+        self.responses = []
+
+    async def check_many(self, phone_numbers):
+        result = self.responses.pop(0)
+        return {phone_number: result for phone_number in phone_numbers}
+
+
+class FakeNumberAnalyzer:
+    def comprehensive_analysis(self, phone_number):
+        return {}
+
+    @staticmethod
+    def normalize_number(phone_number):
+        return '+' + ''.join(c for c in phone_number if c.isdigit())
+
+
+class FakeScanner:
+    """ماسح بنتائج محددة مسبقاً لكل مصدر"""
+
+    max_threads = 2
+
+    def __init__(self):
+        self.breach_scanner = FakeBreachScanner()
+        self.number_analyzer = FakeNumberAnalyzer()
+        self.responses = {}
+
+    def phase(self, name):
+        return contextlib.nullcontext()
+
+    async def async_scan(self, phone_number, scan_type):
+        return self.responses[scan_type].pop(0)
+
+    def _calculate_risk_assessment(self, results):
+        score = results.get('breaches', {}).get('count', 0) + results.get('social_media', {}).get('profiles_found', 0)
+        return {'level': 'مرتفع' if score >= 3 else 'منخفض'}
+
+
+def breaches(*names, error=None):
+    result = {'count': len(names), 'breaches': [{'Name': n} for n in names], 'data_types_found': []}
+    if error:
+        result['error'] = error
+    return result
+
+
+def run_pass(mon, now):
+    return asyncio.run(mon.run_pass(now=now))
+
+
+def test_failed_breach_lookup_is_retried_not_diffed():
+    scanner = FakeScanner()
+    scanner.breach_scanner.responses = [
+        breaches('A', 'B'),
+        breaches(error='Rate limited'),
+        breaches('A', 'B', 'C'),
+    ]
+    mon = WatchlistMonitor(scanner, ['breaches'])
+    mon.add_numbers(['+15551234'])
+
+    assert run_pass(mon, now=mon.next_due()) == []
+
+    # فشل المصدر لا يُعتبر "اختفاء" التسريبات
+    failed_at = mon.next_due()
+    assert run_pass(mon, now=failed_at) == []
+    assert mon.next_due() == failed_at + WatchlistMonitor.RETRY_BACKOFF
+    assert mon.summaries[('+15551234', 'breaches')]['breaches'] == ['A', 'B']
+
+    changes = run_pass(mon, now=mon.next_due())
+    assert [(c['source'], c['field'], c['new']) for c in changes] == [
+        ('breaches', 'count', 3),
+        ('breaches', 'new_breaches', ['C']),
+        ('risk_assessment', 'level', 'مرتفع'),
+    ]
+
+
+def social(profiles):
+    return {'profiles_found': profiles, 'platforms': {}}
+
+
+def test_changes_are_diffed():
+    scanner = FakeScanner()
+    scanner.responses['social_media'] = [social(1), social(1), social(2)]
+    mon = WatchlistMonitor(scanner, ['social_media'], freshness={'social_media': 100})
+    mon.add_numbers(['+15551234'])
+
+    assert run_pass(mon, now=mon.next_due()) == []
+    assert run_pass(mon, now=mon.next_due()) == []
+
+    changes = run_pass(mon, now=mon.next_due())
+    assert [(c['field'], c['old'], c['new']) for c in changes] == [('profiles_found', 1, 2)]
+
+
+def test_refreshes_are_spread_within_window():
+    scanner = FakeScanner()
+    scanner.responses['social_media'] = [social(0) for _ in range(4)]
+    mon = WatchlistMonitor(scanner, ['social_media'], freshness={'social_media': 100})
+    mon.add_numbers(['+1555000%d' % i for i in range(4)])
+
+    now = mon.next_due()
+    run_pass(mon, now=now)
+
+    offsets = sorted(entry[0] - now for entry in mon._schedule)
+    assert len(set(offsets)) == 4
+    assert all(50 <= offset <= 100 for offset in offsets)
+
+
+def test_max_per_tick_limits_refreshes():
+    scanner = FakeScanner()
+    scanner.responses['social_media'] = [social(0) for _ in range(5)]
+    mon = WatchlistMonitor(scanner, ['social_media'], max_per_tick=2)
+    mon.add_numbers(['+1555000%d' % i for i in range(5)])
+
+    asyncio.run(mon.run_pass())
+
+    assert len(mon.results) == 2
+
+
+def test_watchlist_entries_are_normalized():
+    mon = WatchlistMonitor(FakeScanner(), ['social_media'])
+    mon.add_numbers(['+1 555 1234', '+15551234'])
+
+    assert list(mon.basic_info) == ['+15551234']
+
+
+def test_risk_not_diffed_until_baseline_complete():
+    scanner = FakeScanner()
+    scanner.breach_scanner.responses = [breaches('A', 'B')]
+    scanner.responses['social_media'] = [{}, social(2)]
+    mon = WatchlistMonitor(scanner, ['breaches', 'social_media'])
+    mon.add_numbers(['+15551234'])
+
+    # social_media يفشل في أول دورة ثم يصل خط أساسه عند إعادة المحاولة
+    assert run_pass(mon, now=mon.next_due()) == []
+    assert '+15551234' not in mon.risk_levels
+
+    assert run_pass(mon, now=mon.next_due()) == []
+    assert mon.risk_levels['+15551234'] == 'مرتفع'
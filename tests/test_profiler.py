@@ -0,0 +1,94 @@
+import asyncio
+import json
+import time
+
+from src.utils.profiler import ScanProfiler
+
+
+def blocking_callback():
+    time.sleep(0.2)
+
+
+async def run_with_profiler(profiler, body):
+    loop = asyncio.get_running_loop()
+    profiler.attach_loop(loop)
+    try:
+        await body()
+    finally:
+        profiler.detach_loop()
+    return loop
+
+
+def test_stall_capture_records_blocking_stack():
+    profiler = ScanProfiler(slow_threshold=0.05)
+
+    async def body():
+        await asyncio.sleep(0.05)
+        blocking_callback()
+        await asyncio.sleep(0.05)
+
+    asyncio.run(run_with_profiler(profiler, body))
+
+    assert len(profiler.stalls) == 1
+    assert profiler.stalls[0]['duration'] >= 0.05
+    assert any('blocking_callback' in frame for frame in profiler.stalls[0]['stack'])
+
+
+def test_slow_callbacks_are_normalized():
+    profiler = ScanProfiler(slow_threshold=0.05)
+
+    async def body():
+        asyncio.get_running_loop().call_soon(blocking_callback)
+        await asyncio.sleep(0.3)
+
+    asyncio.run(run_with_profiler(profiler, body))
+
+    assert profiler.slow_callbacks
+    entry = profiler.slow_callbacks[0]
+    assert entry['callback'].startswith('<Handle blocking_callback() at ')
+    assert 'created at' not in entry['callback']
+    assert entry['duration'] >= 0.05
+
+
+def test_normalize_callback_strips_run_specific_details():
+    profiler = ScanProfiler()
+    callback = ("<Task finished name='Task-3' coro=<scan() done, defined at /abs/src/core/x.py:11> "
+                "result=None created at /usr/lib/python3.11/asyncio/tasks.py:680>")
+
+    normalized = profiler._normalize_callback(callback)
+
+    assert 'Task-3' not in normalized
+    assert 'created at' not in normalized
+    assert 'result=' not in normalized
+    assert normalized.startswith('<Task finished coro=<scan() done, defined at ')
+
+
+def test_detach_restores_loop_settings():
+    profiler = ScanProfiler(slow_threshold=0.01)
+
+    async def body():
+        await asyncio.sleep(0)
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        before = (loop.get_debug(), loop.slow_callback_duration)
+        await run_with_profiler(profiler, body)
+        return before, (loop.get_debug(), loop.slow_callback_duration)
+
+    before, after = asyncio.run(main())
+    assert before == after
+
+
+def test_phases_and_report(tmp_path):
+    profiler = ScanProfiler(capture=True)
+
+    with profiler.phase('basic_analysis'):
+        sum(range(1000))
+    with profiler.phase('basic_analysis'):
+        with profiler.phase('nested'):
+            pass
+
+    report = json.loads(open(profiler.write_report(str(tmp_path / 'report.json')), encoding='utf-8').read())
+    assert report['phases']['basic_analysis']['calls'] == 2
+    assert report['phases']['basic_analysis']['top_functions']
+    assert 'top_functions' not in report['phases']['nested']
@@ -0,0 +1,69 @@
+import time
+
+import pytest
+
+results_store = pytest.importorskip('src.utils.results_store')
+ResultsStore = results_store.ResultsStore
+
+
+def make_result(phone_number, country_code=1, carrier='att', level='منخفض',
+                breach_count=0, data_types=()):
+    return {
+        'scan_info': {'phone_number': phone_number},
+        'basic_info': {'country_code': country_code, 'carrier': carrier},
+        'breaches': {'count': breach_count, 'data_types_found': list(data_types)},
+        'risk_assessment': {'level': level, 'score': 10}
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultsStore(str(tmp_path / 'results.db'))
+    yield store
+    store.close()
+
+
+def test_query_filters(store):
+    now = time.time()
+    store.save(make_result('+15551234', breach_count=2, data_types=['Passwords', 'Emails']), now)
+    store.save(make_result('+15559999', breach_count=1, data_types=['Emails']), now)
+    store.save(make_result('+447700900123', country_code=44, carrier='vodafone'), now)
+
+    rows = store.query(data_classes=['passwords'], min_breaches=1)
+    assert [row['phone_number'] for row in rows] == ['+15551234']
+    assert sorted(rows[0]['data_classes']) == ['emails', 'passwords']
+
+    assert store.count(country_code=44) == 1
+    assert store.count(carrier='att', max_breaches=1) == 1
+    assert store.count(data_classes=['emails', 'passwords']) == 1
+
+
+def test_query_time_range(store):
+    now = time.time()
+    store.save(make_result('+15551234'), now - 40 * 86400)
+    store.save(make_result('+15551234'), now - 86400)
+
+    assert store.count(since=now - 30 * 86400) == 1
+    assert store.count(until=now - 30 * 86400) == 1
+
+
+def test_phone_number_is_normalized(store):
+    store.save(make_result('+1 555 1234'))
+
+    assert store.count(phone_number='+15551234') == 1
+    assert store.query(phone_number='+1 (555) 1234')[0]['phone_number'] == '+15551234'
+
+
+def test_compact_keeps_summary_and_latest_result(store):
+    now = time.time()
+    old_id = store.save(make_result('+15551234', breach_count=3), now - 100 * 86400)
+    latest_id = store.save(make_result('+15551234', breach_count=1), now - 95 * 86400)
+    recent_id = store.save(make_result('+15559999'), now)
+
+    assert store.compact(older_than_days=90) == 1
+
+    assert store.get_result(old_id) is None
+    assert store.get_result(latest_id)['breaches']['count'] == 1
+    assert store.get_result(recent_id) is not None
+    # الحقول المفهرسة تبقى قابلة للبحث بعد الضغط
+    assert store.count(min_breaches=3) == 1